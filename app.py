@@ -13,11 +13,19 @@ except Exception:
 import os
 import io
 import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Any
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    send_file, session, flash, jsonify, current_app
+    send_file, session, flash, jsonify, current_app,
+    Response, stream_with_context
 )
 from werkzeug.utils import secure_filename
 
@@ -35,6 +43,7 @@ except Exception:
 
 # Processing service
 from services.summarizer import (
+    CACHE_SUBDIR,
     GenerateOptions,
     FileAnalyzer,
     SummarizerService,
@@ -58,6 +67,97 @@ except Exception:
     TTFont = None  # type: ignore
 
 
+# Static UI data shared across requests (immutable, so safe at module scope)
+_LIMITS = MappingProxyType({
+    "max_files": 10,
+    "max_file_mb": 50,
+    "max_total_pages": 250,
+})
+
+_DEFAULT_OPTIONS = MappingProxyType({
+    "task": "summary",
+    "words": 800,
+    "language": "English",
+    "output": "txt",
+    "notes": "",
+})
+
+_LANGUAGES = (
+    "English", "Polish", "Turkish", "Azerbaijani", "Russian", "German",
+    "French", "Spanish", "Italian", "Portuguese", "Ukrainian", "Arabic",
+    "Chinese", "Japanese", "Korean", "Hindi",
+)
+
+# Upload retention sweeps run at most this often (seconds), and only from
+# /upload — never on read-only requests.
+_CLEANUP_INTERVAL_S = 60.0
+_last_cleanup = [0.0]
+_cleanup_lock = threading.Lock()
+
+# Whitespace splitter for PDF line wrapping (keeps the separators).
+_WS_SPLIT_RE = re.compile(r"(\s+)")
+
+# None = not probed yet, True/False = registration outcome (process-global).
+_pdf_font_registered: Any = None
+
+
+@lru_cache(maxsize=1)
+def _find_pdf_font_path() -> Optional[str]:
+    """Probe candidate DejaVuSans locations once per process."""
+    for p in (
+        os.path.join("static", "fonts", "DejaVuSans.ttf"),
+        os.path.join(os.getcwd(), "static", "fonts", "DejaVuSans.ttf"),
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ):
+        if os.path.isfile(p):
+            return p
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _pdf_page_count(path: str, size: int, mtime_ns: int) -> int:
+    """
+    Page count for an immutable upload. size/mtime_ns key the cache so a
+    replaced file re-parses; repeat index renders hit the cache.
+    """
+    if PdfReader is None:
+        return 0
+    try:
+        with open(path, "rb") as fh:
+            return len(PdfReader(fh).pages)
+    except Exception:
+        return 0
+
+
+def _ensure_pdf_font_registered() -> bool:
+    """Register DejaVuSans once per process; returns whether it is usable."""
+    global _pdf_font_registered
+    if pdfmetrics is None or TTFont is None:
+        return False
+    if _pdf_font_registered is None:
+        _pdf_font_registered = False
+        font_path = _find_pdf_font_path()
+        if font_path is not None:
+            try:
+                pdfmetrics.registerFont(TTFont("DejaVuSans", font_path))
+                _pdf_font_registered = True
+            except Exception:
+                pass
+    return _pdf_font_registered
+
+# Per-(font, size) char-width tables, pre-seeded with printable ASCII and
+# extended lazily for other chars; lru_cache shares them across exports.
+@lru_cache(maxsize=8)
+def _char_width_table(font_name: str, font_size: float) -> dict:
+    if pdfmetrics is None:
+        return {}
+    try:
+        return {chr(i): pdfmetrics.stringWidth(chr(i), font_name, font_size)
+                for i in range(32, 127)}
+    except Exception:
+        return {}
+
+
 # -----------------------------------------------------------------------------
 # Flask App Factory
 # -----------------------------------------------------------------------------
@@ -76,9 +176,21 @@ def create_app() -> Flask:
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "change-me")
     app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", os.path.join(os.getcwd(), "uploads"))
     app.config["OUTPUT_FOLDER"] = os.getenv("OUTPUT_FOLDER", os.path.join(os.getcwd(), "outputs"))
+    app.config["MAX_FILE_MB"] = int(os.getenv("MAX_FILE_MB", "50"))
     app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024  # 50MB per request
     app.config["MAX_TOTAL_PAGES"] = int(os.getenv("MAX_TOTAL_PAGES", "250"))
+    app.config["RETENTION_HOURS"] = int(os.getenv("RETENTION_HOURS", "24"))
+    app.config["MAX_STORAGE_MB_TOTAL"] = int(os.getenv("MAX_STORAGE_MB_TOTAL", "1024"))
     app.config["TEMPLATES_AUTO_RELOAD"] = True
+    # Let the reverse proxy serve on-disk exports zero-copy (X-Sendfile /
+    # X-Accel-Redirect); needs `sendfile on;` or equivalent in the proxy.
+    app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "0") == "1"
+    # Exports stream from memory by default; set ARCHIVE_EXPORTS=1 to also
+    # keep a copy in OUTPUT_FOLDER.
+    app.config["ARCHIVE_EXPORTS"] = os.getenv("ARCHIVE_EXPORTS", "0") == "1"
+    # Static assets (css, the 700KB DejaVuSans.ttf) rarely change; let
+    # browsers cache them instead of re-fetching per page load.
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = int(os.getenv("SEND_FILE_MAX_AGE_DEFAULT", "86400"))
     # Session(app)
 
     try:
@@ -96,18 +208,38 @@ def create_app() -> Flask:
         print("⚠️ Flask-Session tapılmadı — cookie-based session aktivdir.")
 
     # Ensure folders exist
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-    os.makedirs(app.config["OUTPUT_FOLDER"], exist_ok=True)
+    # Resolved once; these never change after startup, so routes use the
+    # closure locals instead of re-reading app.config per request.
+    uploads_dir = app.config["UPLOAD_FOLDER"]
+    output_dir = app.config["OUTPUT_FOLDER"]
+    os.makedirs(uploads_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
     # os.makedirs(app.config["SESSION_FILE_DIR"], exist_ok=True)
 
 
+    # Register the Unicode PDF font once at startup; exports only setFont.
+    app.config["_PDF_FONT_OK"] = _ensure_pdf_font_registered()
+
     # CSRF
     csrf = CSRFProtect()
     csrf.init_app(app)
 
+    # Background generation jobs (polled via /status/<jid>); entries carry
+    # their submit time so abandoned jobs can be aged out.
+    executor = ThreadPoolExecutor(max_workers=4)
+    jobs: Dict[str, Tuple[Future, float]] = {}
+    _JOB_TTL_S = 3600.0
+
     # Rate limiter (keep behavior if available)
     if Limiter is not None:
-        limiter = Limiter(get_remote_address, app=app, default_limits=["120 per hour"])
+        # Point RATELIMIT_STORAGE_URI at redis:// in production so counters
+        # are shared across gunicorn workers; in-memory enforces per worker.
+        limiter = Limiter(
+            get_remote_address,
+            app=app,
+            default_limits=["120 per hour"],
+            storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+        )
     else:
         limiter = None  # type: ignore
 
@@ -120,24 +252,54 @@ def create_app() -> Flask:
         _, ext = os.path.splitext(filename.lower())
         return ext in ALLOWED_EXTENSIONS
 
-    def _register_pdf_font_if_available(c: Any) -> None:
-        """Register DejaVuSans if present for Unicode PDF output."""
-        if pdfmetrics is None or TTFont is None:
+    def _maybe_cleanup_uploads() -> None:
+        """
+        Drop uploads older than RETENTION_HOURS. Throttled to once per
+        minute and triggered only from /upload, so read-only requests
+        never pay for a directory sweep.
+        """
+        now = time.monotonic()
+        if now - _last_cleanup[0] < _CLEANUP_INTERVAL_S:
             return
-        candidate_paths: List[str] = [
-            os.path.join("static", "fonts", "DejaVuSans.ttf"),
-            os.path.join(os.getcwd(), "static", "fonts", "DejaVuSans.ttf"),
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        ]
-        for p in candidate_paths:
-            if os.path.isfile(p):
+        with _cleanup_lock:
+            if time.monotonic() - _last_cleanup[0] < _CLEANUP_INTERVAL_S:
+                return
+            _last_cleanup[0] = time.monotonic()
+        cutoff = time.time() - app.config["RETENTION_HOURS"] * 3600
+        survivors = []
+        try:
+            with os.scandir(uploads_dir) as it:
+                for e in it:
+                    try:
+                        if not e.is_file():
+                            continue
+                        st = e.stat()
+                        if st.st_mtime < cutoff:
+                            os.unlink(e.path)
+                            # Take the extracted-text sidecar with it
+                            FileAnalyzer.drop_cached_text(uploads_dir, e.name)
+                        else:
+                            survivors.append((st.st_mtime, st.st_size, e.path, e.name))
+                    except OSError:
+                        pass
+        except FileNotFoundError:
+            return
+
+        # Quota eviction, oldest first. Sizes come from the same scandir
+        # pass — no second walk and no extra stat per file.
+        quota = app.config["MAX_STORAGE_MB_TOTAL"] * 1024 * 1024
+        total = sum(size for _mtime, size, _path, _name in survivors)
+        if total > quota:
+            survivors.sort()
+            for _mtime, size, path, name in survivors:
+                if total <= quota:
+                    break
                 try:
-                    pdfmetrics.registerFont(TTFont("DejaVuSans", p))
-                    c.setFont("DejaVuSans", 11)
-                    return
-                except Exception:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
                     continue
-
+                FileAnalyzer.drop_cached_text(uploads_dir, name)
 
     def _pdf_write_multiline(c: Any, text: str, x: int = 50, y_start: int = 800, line_height: int = 16, right_margin: int = 50) -> None:
         """
@@ -151,15 +313,33 @@ def create_app() -> Flask:
         font_name = getattr(c, "_fontname", "DejaVuSans")
         font_size = getattr(c, "_fontsize", 11)
 
+        # Per-char width table so token widths are pure Python arithmetic
+        # instead of a pdfmetrics.stringWidth call per token.
+        width_table = _char_width_table(font_name, font_size)
+
+        def token_width(token: str) -> float:
+            w = 0.0
+            for ch in token:
+                cw = width_table.get(ch)
+                if cw is None:
+                    cw = pdfmetrics.stringWidth(ch, font_name, font_size)
+                    width_table[ch] = cw
+                w += cw
+            return w
+
         def wrap_by_width(line: str):
             if not line:
                 yield ""
                 return
-            parts = re.split(r"(\s+)", line)  # keep spaces
+            # Most summary lines fit as-is; skip the split + token loop.
+            if token_width(line) <= max_width:
+                yield line.rstrip()
+                return
+            parts = _WS_SPLIT_RE.split(line)  # keep spaces
             buf = ""
             buf_w = 0.0
             for token in parts:
-                w = pdfmetrics.stringWidth(token, font_name, font_size)
+                w = token_width(token)
                 if buf and (buf_w + w) > max_width:
                     yield buf.rstrip()
                     buf = token
@@ -170,19 +350,57 @@ def create_app() -> Flask:
             if buf:
                 yield buf.rstrip()
 
+        def new_text_object():
+            tobj = c.beginText(x, y_start)
+            try:
+                tobj.setFont(font_name, font_size)
+            except Exception:
+                pass
+            tobj.setLeading(line_height)
+            return tobj
+
+        # One batched text object per page (single BT/ET pair) instead of
+        # a drawString operator sequence per line.
+        tobj = new_text_object()
         y = y_start
         for raw_line in text.splitlines():
             for phys_line in wrap_by_width(raw_line):
                 if y < 40:  # new page
+                    c.drawText(tobj)
                     c.showPage()
-                    # re-apply font on new page
-                    try:
-                        c.setFont(font_name, font_size)
-                    except Exception:
-                        pass
+                    tobj = new_text_object()
                     y = y_start
-                c.drawString(x, y, phys_line)
+                tobj.textLine(phys_line)
                 y -= line_height
+        c.drawText(tobj)
+
+    # Result text lives on disk; the session only carries a short id.
+    # Keeps the filesystem-backed session pickle small on every request.
+
+    def _result_path(rid: str) -> str:
+        return os.path.join(output_dir, f"result_{rid}.txt")
+
+    def _store_result_text(text: str) -> None:
+        rid = uuid.uuid4().hex
+        with open(_result_path(rid), "w", encoding="utf-8") as fh:
+            fh.write(text)
+        old = session.pop("last_result_id", None)
+        if old:
+            try:
+                os.remove(_result_path(old))
+            except OSError:
+                pass
+        session["last_result_id"] = rid
+
+    def _load_result_text() -> str:
+        rid = session.get("last_result_id")
+        if not rid:
+            return ""
+        try:
+            with open(_result_path(rid), "r", encoding="utf-8") as fh:
+                return fh.read()
+        except OSError:
+            return ""
 
     # -----------------------------------------------------------------------------
     # Routes
@@ -190,77 +408,71 @@ def create_app() -> Flask:
 
     @app.get("/")
     def index():
-        # limits for UI
-        limits = {
-            "max_files": 10,
-            "max_file_mb": 50,
-            "max_total_pages": 250,
-        }
-
         # list uploaded files (basic metadata)
-        uploads_dir = current_app.config["UPLOAD_FOLDER"]
-        files = []
+        entries = []
         total_pages = 0
         if os.path.isdir(uploads_dir):
-            for name in sorted(os.listdir(uploads_dir)):
-                path = os.path.join(uploads_dir, name)
-                if not os.path.isfile(path):
-                    continue
-                ext = os.path.splitext(name)[1].lower()
-                size_bytes = os.path.getsize(path)
-
-                pages = 0
-                if ext == ".pdf":
-                    try:
-                        from PyPDF2 import PdfReader  # local import to avoid hard fail if missing
-                        with open(path, "rb") as fh:
-                            pages = len(PdfReader(fh).pages)
-                    except Exception:
-                        pages = 0
-
-
-
-                files.append({
+            # scandir's DirEntry caches type/stat info from the directory
+            # read, so this is ~1 syscall per file instead of ~3.
+            with os.scandir(uploads_dir) as it:
+                for e in it:
+                    if not e.is_file():
+                        continue
+                    ext = os.path.splitext(e.name)[1].lower()
+                    st = e.stat()
+                    pages = (_pdf_page_count(e.path, st.st_size, st.st_mtime_ns)
+                             if ext == ".pdf" else 0)
+                    entries.append((e.name, ext, st.st_size, pages))
+            entries.sort(key=lambda t: t[0])
+            total_pages = sum(t[3] for t in entries)
+
+        def _iter_files():
+            # Lazy per-row dicts: Jinja consumes them one at a time, so the
+            # full list of dicts never sits in memory alongside the render.
+            for name, ext, size_bytes, pages in entries:
+                yield {
                     "id": name,  # used as fid in template
                     "name": name,
                     "ext": ext[1:].upper() if ext else "",
-                    "pages": 0,  # optional: real page count can be added later
+                    "pages": pages,
                     "size_bytes": size_bytes,
-                })
-
-        # options defaults
-        options = {
-            "task": "summary",
-            "words": 800,
-            "language": "English",
-            "output": "txt",
-            "notes": "",
-        }
+                }
+
+        # options defaults (clone the shared mapping, then apply session overrides)
+        options = dict(_DEFAULT_OPTIONS)
         if "options" in session:
             options.update(session["options"])
 
-        languages = [
-            "English","Polish","Turkish","Azerbaijani","Russian","German",
-            "French","Spanish","Italian","Portuguese","Ukrainian","Arabic",
-            "Chinese","Japanese","Korean","Hindi"
-        ]
-
         stats = {
-            "files": len(files),
+            "files": len(entries),
             "pages": total_pages,
-            "bytes": sum(f["size_bytes"] for f in files)
+            "bytes": sum(t[2] for t in entries)
         }
 
-        result_text = session.get("last_result_text", "")
+        # Harvest a finished background generation, if any
+        jid = session.get("pending_job_id")
+        if jid:
+            entry = jobs.get(jid)
+            if entry is not None and entry[0].done():
+                try:
+                    _store_result_text(entry[0].result())
+                except Exception:
+                    pass
+                jobs.pop(jid, None)
+                session.pop("pending_job_id", None)
+
+        result_text = _load_result_text()
 
         return render_template(
             "index.html",
-            limits=limits,
-            files=files,
+            limits=_LIMITS,
+            files=_iter_files(),
             options=options,
-            languages=languages,
+            languages=_LANGUAGES,
             stats=stats,
-            result_text=result_text
+            result_text=result_text,
+            # Still-running job, if any: the template polls /status for it
+            pending_job_id=session.get("pending_job_id")
         )
 
     @app.post("/upload")
@@ -270,53 +482,97 @@ def create_app() -> Flask:
             return redirect(url_for("index"))
 
         files = request.files.getlist("files")
+        max_file_bytes = current_app.config["MAX_FILE_MB"] * 1024 * 1024
         saved = 0
         for f in files:
             if not f or f.filename == "":
                 continue
             if not _allowed_file(f.filename):
                 continue
+            # Reject oversize uploads before writing a byte when the part
+            # declares its length, and cap the copy either way so a lying
+            # client can't fill the disk first.
+            if f.content_length and f.content_length > max_file_bytes:
+                flash(f"{f.filename} exceeds the {current_app.config['MAX_FILE_MB']}MB limit.", "warning")
+                continue
             fname = secure_filename(f.filename)
-            f.save(os.path.join(current_app.config["UPLOAD_FOLDER"], fname))
+            dest = os.path.join(uploads_dir, fname)
+            with open(dest, "wb") as out:
+                try:
+                    # Kernel-side copy when the upload spooled to a real file.
+                    # sendfile(2) may transfer fewer bytes than asked, so loop
+                    # advancing the source offset until it reports end of file
+                    # (or the copy exceeds the limit).
+                    copied = 0
+                    while copied <= max_file_bytes:
+                        sent = os.sendfile(out.fileno(), f.stream.fileno(),
+                                           copied, max_file_bytes + 1 - copied)
+                        if sent == 0:
+                            break
+                        copied += sent
+                except (AttributeError, OSError, io.UnsupportedOperation):
+                    # In-memory stream (small upload) or no sendfile: copy with
+                    # a 1MB buffer instead of Werkzeug's default 16KB chunks.
+                    # Discard anything a partial sendfile already wrote.
+                    out.seek(0)
+                    out.truncate()
+                    f.stream.seek(0)
+                    copied = 0
+                    while chunk := f.stream.read(1024 * 1024):
+                        copied += len(chunk)
+                        if copied > max_file_bytes:
+                            break
+                        out.write(chunk)
+            if copied > max_file_bytes:
+                os.remove(dest)
+                flash(f"{f.filename} exceeds the {current_app.config['MAX_FILE_MB']}MB limit.", "warning")
+                continue
+            # Warm the extracted-text sidecar off the request thread so
+            # /generate reads cached text instead of re-parsing the file.
+            executor.submit(FileAnalyzer.cache_extracted_text, uploads_dir, fname)
             saved += 1
 
         if saved == 0:
             flash("No valid files uploaded.", "warning")
         else:
             flash(f"{saved} file(s) uploaded.", "success")
+
+        _maybe_cleanup_uploads()
         return redirect(url_for("index"))
 
     @app.post("/remove/<path:fid>")
     def remove(fid):
-        uploads_dir = current_app.config["UPLOAD_FOLDER"]
         path = os.path.join(uploads_dir, fid)
+        # Single unlink; a missing file surfaces as FileNotFoundError, so
+        # no isfile() pre-check (stat) is needed.
         try:
-            if os.path.isfile(path):
-                os.remove(path)
-                flash("File removed.", "success")
-            else:
-                flash("File not found.", "warning")
-        except Exception:
+            os.remove(path)
+        except FileNotFoundError:
+            flash("File not found.", "warning")
+        except OSError:
             flash("Could not remove file.", "error")
+        else:
+            FileAnalyzer.drop_cached_text(uploads_dir, fid)
+            flash("File removed.", "success")
         return redirect(url_for("index"))
 
     @app.post("/reset")
     def reset():
         # Clear session
         session.clear()
-        # Clean uploads dir
-        uploads_dir = current_app.config["UPLOAD_FOLDER"]
+        # Clean uploads dir (scandir avoids the extra stat per entry)
         try:
-            if os.path.isdir(uploads_dir):
-                for name in os.listdir(uploads_dir):
-                    path = os.path.join(uploads_dir, name)
-                    if os.path.isfile(path):
+            with os.scandir(uploads_dir) as it:
+                for e in it:
+                    if e.is_file():
                         try:
-                            os.remove(path)
-                        except Exception:
+                            os.unlink(e.path)
+                        except OSError:
                             pass
-        except Exception:
+        except FileNotFoundError:
             pass
+        # Extracted-text sidecars go with the uploads
+        shutil.rmtree(os.path.join(uploads_dir, CACHE_SUBDIR), ignore_errors=True)
         flash("Session and uploads reset.", "success")
         return redirect(url_for("index"))
 
@@ -331,12 +587,17 @@ def create_app() -> Flask:
         def generate():
             return _generate_impl()
 
+    def _do_generate(options: GenerateOptions) -> str:
+        """Runs on the executor: build corpus and call the API (or mock)."""
+        corpus, _metas = FileAnalyzer.extract_corpus(app, max_chars=120_000)
+        service = SummarizerService()
+        return service.generate(corpus, options)
+
     def _generate_impl():
         """
         - Read task/words/language/output/notes
-        - Build corpus from uploaded files
-        - Build prompt and call API (or mock)
-        - Save ONLY to session and redirect to index (show in Result editor)
+        - Submit corpus build + generation to the background executor
+        - Redirect to index immediately; index/status pick up the result
         - Download happens later via /export
         """
         task = request.form.get("task", "summary")
@@ -361,19 +622,104 @@ def create_app() -> Flask:
             "output": options.normalized_output(),
             "notes": options.notes,
         }
+        # Precompute export metadata now so /export doesn't have to
+        # re-hydrate a GenerateOptions from the session dict.
+        session["last_export_basename"] = build_base_filename(options)
+        session["last_export_output"] = options.normalized_output()
+
+        # Run extraction + generation off the request thread so a slow
+        # corpus or API call does not pin the HTTP worker.
+        jid = uuid.uuid4().hex
+        # Age out finished jobs nobody ever collected (tab closed before
+        # the result came back) so futures don't accumulate forever.
+        now = time.time()
+        for k in [k for k, (f, ts) in jobs.items() if f.done() and now - ts > _JOB_TTL_S]:
+            jobs.pop(k, None)
+        jobs[jid] = (executor.submit(_do_generate, options), now)
+        session["pending_job_id"] = jid
+
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({"job_id": jid}), 202
+
+        flash("Generation started. The result will appear on the right shortly.", "success")
+        return redirect(url_for("index"))
 
-        # Build corpus
-        corpus, _metas = FileAnalyzer.extract_corpus(app, max_chars=120_000)
+    @app.post("/generate/stream")
+    def generate_stream():
+        """Stream the generation as server-sent events instead of polling.
+
+        Same form fields as /generate. Pieces arrive as `data:` events
+        while the model is still writing, so the first text shows up after
+        ~one token of latency rather than the full completion time.
+        """
+        task = request.form.get("task", "summary")
+        words = int((request.form.get("words") or "800").strip() or 800)
+        language = request.form.get("language", "English").strip()
+        output = request.form.get("output", "txt").strip().lower()
+        notes = request.form.get("notes", "").strip()
 
-        # Generate
+        options = GenerateOptions(task=task, words=words, language=language,
+                                  notes=notes, output=output)
+        corpus, _metas = FileAnalyzer.extract_corpus(app, max_chars=120_000)
         service = SummarizerService()
-        result_text = service.generate(corpus, options)
 
-        # Store only, DO NOT download here
-        session["last_result_text"] = result_text
+        # The result id and export metadata must go into the session before
+        # the response starts streaming (cookies ride on the headers); the
+        # result file itself is written once the stream finishes.
+        rid = uuid.uuid4().hex
+        old = session.pop("last_result_id", None)
+        if old:
+            try:
+                os.remove(_result_path(old))
+            except OSError:
+                pass
+        session["last_result_id"] = rid
+        session["last_export_basename"] = build_base_filename(options)
+        session["last_export_output"] = options.normalized_output()
+
+        def _events():
+            collected = []
+            for piece in service.generate_stream(corpus, options):
+                collected.append(piece)
+                # SSE frames: each data line ends with a blank line
+                yield "data: " + piece.replace("\n", "\ndata: ") + "\n\n"
+            # Persist for /export and the next index render
+            try:
+                with open(_result_path(rid), "w", encoding="utf-8") as fh:
+                    fh.write("".join(collected))
+            except OSError:
+                pass
+            yield "event: done\ndata: \n\n"
+
+        return Response(
+            stream_with_context(_events()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-        flash("Generated. Review the result on the right, then use 'Save & Download'.", "success")
-        return redirect(url_for("index"))
+    @app.get("/status/<jid>")
+    def status(jid: str):
+        entry = jobs.get(jid)
+        if entry is None:
+            return jsonify({"done": True, "result": None}), 404
+        fut = entry[0]
+        if not fut.done():
+            return jsonify({"done": False, "result": None})
+        # Collected: drop the future now so finished results don't sit in
+        # process memory waiting for an index load that may never come.
+        jobs.pop(jid, None)
+        try:
+            result = fut.result()
+        except Exception:
+            result = None
+        if result is not None and session.get("pending_job_id") == jid:
+            # Mirror the index harvest so the UI still shows the result
+            try:
+                _store_result_text(result)
+            except Exception:
+                pass
+            session.pop("pending_job_id", None)
+        return jsonify({"done": True, "result": result})
 
     @app.post("/export")
     def export():
@@ -382,61 +728,96 @@ def create_app() -> Flask:
             flash("Nothing to export.", "warning")
             return redirect(url_for("index"))
 
-        opts = session.get("options", {}) or {}
-        output = (opts.get("output") or "txt").lower()
-
-        options = GenerateOptions(
-            task=opts.get("task", "summary"),
-            words=int(opts.get("words", 800)),
-            language=opts.get("language", "English"),
-            notes=opts.get("notes", ""),
-            output=output
-        )
-        base_name = build_base_filename(options)
+        output = (session.get("last_export_output") or "txt").lower()
+        base_name = session.get("last_export_basename") or build_base_filename(GenerateOptions())
 
         if output == "pdf":
-            path = os.path.join(current_app.config["OUTPUT_FOLDER"], f"{base_name}.pdf")
+            path = os.path.join(output_dir, f"{base_name}.pdf")
             return _export_pdf(text, path, f"{base_name}.pdf")
         elif output == "docx":
-            path = os.path.join(current_app.config["OUTPUT_FOLDER"], f"{base_name}.docx")
+            path = os.path.join(output_dir, f"{base_name}.docx")
             return _export_docx(text, path, f"{base_name}.docx")
         else:
             return _export_txt(text, f"{base_name}.txt")
 
+    # Health probes can hit several times a second; cache the formatted
+    # timestamp at 1s granularity instead of allocating a fresh ISO string.
+    _health_ts_cache = [0.0, ""]
+
     @app.get("/health")
     def health():
-        return jsonify({"ok": True, "time": datetime.utcnow().isoformat() + "Z"})
+        now = time.time()
+        if now - _health_ts_cache[0] >= 1.0:
+            _health_ts_cache[0] = now
+            _health_ts_cache[1] = datetime.utcfromtimestamp(now).isoformat() + "Z"
+        return jsonify({"ok": True, "time": _health_ts_cache[1]})
 
     # -----------------------------------------------------------------------------
     # Export helpers
     # -----------------------------------------------------------------------------
 
     def _export_txt(text: str, download_name: str):
-        bio = io.BytesIO()
-        bio.write(text.encode("utf-8"))
-        bio.seek(0)
+        # Encode exactly once; the compare below and the streamed chunks
+        # (zero-copy memoryview slices) all reuse the same buffer.
+        data = text.encode("utf-8")
+
+        # If the user hasn't edited the generated result, the exact bytes
+        # already sit in OUTPUT_FOLDER — let send_file use the kernel
+        # sendfile path instead of pushing them through Python.
+        rid = session.get("last_result_id")
+        if rid:
+            path = _result_path(rid)
+            try:
+                with open(path, "rb") as fh:
+                    unchanged = fh.read() == data
+            except OSError:
+                unchanged = False
+            if unchanged:
+                session["last_result_path"] = path
+                return send_file(
+                    path,
+                    mimetype="text/plain; charset=utf-8",
+                    as_attachment=True,
+                    download_name=download_name,
+                    conditional=True,
+                )
+
+        def _chunks(buf: bytes, size: int = 64 * 1024):
+            mv = memoryview(buf)
+            for i in range(0, len(mv), size):
+                yield mv[i:i + size]
+
         session["last_result_path"] = None
-        return send_file(
-            bio,
+        return Response(
+            stream_with_context(_chunks(data)),
             mimetype="text/plain; charset=utf-8",
-            as_attachment=True,
-            download_name=download_name,
+            headers={"Content-Disposition": f'attachment; filename="{download_name}"'},
         )
 
+    def _maybe_archive(buf: io.BytesIO, path: str) -> None:
+        """Persist an export to OUTPUT_FOLDER only when archiving is on."""
+        if current_app.config.get("ARCHIVE_EXPORTS"):
+            with open(path, "wb") as fh:
+                fh.write(buf.getbuffer())
+            session["last_result_path"] = path
+        else:
+            session["last_result_path"] = None
+
     def _export_docx(text: str, path: str, download_name: str):
         if Document is None:
             return _export_txt(text, download_name.replace(".docx", ".txt"))
 
         doc = Document()
+        # One paragraph (one run) per block; in-block newlines render fine
+        # and the document stays a fraction of the size of run-per-line.
         for block in text.split("\n\n"):
-            p = doc.add_paragraph()
-            for line in block.splitlines():
-                p.add_run(line)
-                p.add_run("\n")
-        doc.save(path)
-        session["last_result_path"] = path
+            doc.add_paragraph(block)
+        buf = io.BytesIO()
+        doc.save(buf)
+        _maybe_archive(buf, path)
+        buf.seek(0)
         return send_file(
-            path,
+            buf,
             mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
             as_attachment=True,
             download_name=download_name,
@@ -446,18 +827,18 @@ def create_app() -> Flask:
         if canvas is None:
             return _export_txt(text, download_name.replace(".pdf", ".txt"))
 
-        c = canvas.Canvas(path)
-        _register_pdf_font_if_available(c)
-        try:
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf)
+        # Font was registered at startup; just select it (or keep Helvetica).
+        if current_app.config.get("_PDF_FONT_OK"):
             c.setFont("DejaVuSans", 11)
-        except Exception:
-            pass
         _pdf_write_multiline(c, text, x=50, y_start=800, line_height=16)
         c.showPage()
         c.save()
-        session["last_result_path"] = path
+        _maybe_archive(buf, path)
+        buf.seek(0)
         return send_file(
-            path,
+            buf,
             mimetype="application/pdf",
             as_attachment=True,
             download_name=download_name,
@@ -35,5 +35,7 @@ class ProductionConfig:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", SQLITE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
-        "connect_args": {"check_same_thread": False}  # SQLite üçün təhlükəsiz
+        "connect_args": {"check_same_thread": False},  # SQLite üçün təhlükəsiz
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
     }
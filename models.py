@@ -5,7 +5,7 @@ class UserSession(db.Model):
     __tablename__ = "user_sessions"
 
     id = db.Column(db.Integer, primary_key=True)
-    bucket_uuid = db.Column(db.String(64), index=True, nullable=False)
+    bucket_uuid = db.Column(db.String(64), unique=True, index=True, nullable=False)
     ip_hash = db.Column(db.String(128), index=True, nullable=True)
     user_agent = db.Column(db.Text, nullable=True)
 
@@ -0,0 +1,65 @@
+# services/llm_batcher.py
+# -*- coding: utf-8 -*-
+"""
+Shared dispatch pool for LLM calls. Concurrent requests fan out on one
+bounded ThreadPoolExecutor instead of each Flask worker opening its own
+connection at its own moment; the pool width caps in-flight calls at the
+provider concurrency budget. Each call is dispatched as soon as it is
+dequeued — a lone request pays no collection delay.
+"""
+
+from __future__ import annotations
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+
+
+class DynamicBatcher:
+    """Queues calls and fans them out on a bounded pool; at most
+    batch_size API calls are in flight at once."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self._batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=batch_size)
+        self._worker_started = False
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], Any]) -> Any:
+        """Run fn through the batcher and block for its result. Exceptions
+        propagate to the caller unchanged."""
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((fn, fut))
+        return fut.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker_started:
+            return
+        with self._lock:
+            if not self._worker_started:
+                t = threading.Thread(target=self._run, daemon=True)
+                t.start()
+                self._worker_started = True
+
+    def _run(self) -> None:
+        while True:
+            # Dispatch immediately on dequeue; items queued while the pool
+            # is busy form the next concurrent wave on their own.
+            fn, fut = self._queue.get()
+            self._pool.submit(self._run_one, fn, fut)
+
+    @staticmethod
+    def _run_one(fn: Callable[[], Any], fut: Future) -> None:
+        try:
+            fut.set_result(fn())
+        except BaseException as exc:
+            fut.set_exception(exc)
+
+
+# Shared instance for SummarizerService API calls
+llm_batcher = DynamicBatcher()
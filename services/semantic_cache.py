@@ -0,0 +1,92 @@
+# services/semantic_cache.py
+# -*- coding: utf-8 -*-
+"""
+Optional semantic cache for LLM prompts. Where the exact-match cache only
+catches identical inputs, this returns a stored response when a new prompt
+embeds close enough (cosine similarity) to a previous one.
+
+Disabled unless SEMANTIC_CACHE=1 and both sentence-transformers and faiss
+are importable; everything fails soft otherwise.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from typing import Any, List, Optional
+
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore
+except Exception:
+    SentenceTransformer = None  # type: ignore
+
+try:
+    import faiss  # type: ignore
+    import numpy as np  # type: ignore
+except Exception:
+    faiss = None  # type: ignore
+    np = None  # type: ignore
+
+ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+MODEL_NAME = os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.90"))
+MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+
+
+class SemanticCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._model = None  # loaded lazily on first use
+        self._index = None
+        self._vectors: List[Any] = []
+        self._responses: List[str] = []
+
+    @staticmethod
+    def available() -> bool:
+        return ENABLED and SentenceTransformer is not None and faiss is not None
+
+    def _embed(self, text: str):
+        if self._model is None:
+            self._model = SentenceTransformer(MODEL_NAME)
+        # Normalized vectors make inner product == cosine similarity
+        vec = self._model.encode([text], normalize_embeddings=True)
+        return np.asarray(vec, dtype="float32")
+
+    def get(self, prompt: str) -> Optional[str]:
+        if not self.available():
+            return None
+        try:
+            vec = self._embed(prompt)
+            with self._lock:
+                if self._index is None or self._index.ntotal == 0:
+                    return None
+                scores, ids = self._index.search(vec, 1)
+                if scores[0][0] >= THRESHOLD:
+                    return self._responses[ids[0][0]]
+        except Exception:
+            return None
+        return None
+
+    def put(self, prompt: str, response: str) -> None:
+        if not self.available() or not response:
+            return
+        try:
+            vec = self._embed(prompt)
+            with self._lock:
+                if self._index is None:
+                    self._index = faiss.IndexFlatIP(vec.shape[1])
+                if len(self._responses) >= MAX_ENTRIES:
+                    # Drop the older half and rebuild the flat index
+                    keep = MAX_ENTRIES // 2
+                    self._vectors = self._vectors[-keep:]
+                    self._responses = self._responses[-keep:]
+                    self._index = faiss.IndexFlatIP(vec.shape[1])
+                    self._index.add(np.vstack(self._vectors))
+                self._vectors.append(vec[0])
+                self._responses.append(response)
+                self._index.add(vec)
+        except Exception:
+            pass
+
+
+# Shared instance; SummarizerService uses this
+semantic_cache = SemanticCache()
@@ -2,12 +2,21 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
+import io
 import os
 import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple, Optional, Dict, Any
 
 # Optional imports (fail-soft)
+try:
+    import fitz  # PyMuPDF  # type: ignore
+except Exception:
+    fitz = None  # type: ignore
+
 try:
     from PyPDF2 import PdfReader  # type: ignore
 except Exception:
@@ -18,12 +27,40 @@ try:
 except Exception:
     docx = None  # type: ignore
 
+try:
+    from lxml import etree  # type: ignore
+except Exception:
+    etree = None  # type: ignore
+
 # OpenAI (v1) fail-soft import
 try:
     from openai import OpenAI  # type: ignore
 except Exception:
     OpenAI = None  # type: ignore
 
+try:
+    import httpx  # type: ignore
+except Exception:
+    httpx = None  # type: ignore
+
+# Exact-match response cache (fail-soft, like the parsers above)
+try:
+    from utils import llm_cache  # type: ignore
+except Exception:
+    llm_cache = None  # type: ignore
+
+# Optional embedding-based cache (SEMANTIC_CACHE=1)
+try:
+    from services.semantic_cache import semantic_cache  # type: ignore
+except Exception:
+    semantic_cache = None  # type: ignore
+
+# Dynamic batching of concurrent API calls
+try:
+    from services.llm_batcher import llm_batcher  # type: ignore
+except Exception:
+    llm_batcher = None  # type: ignore
+
 
 # -----------------------------
 # Constants & Config
@@ -38,33 +75,55 @@ ALLOWED_LANGUAGES: List[str] = [
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
-PROMPT_TEMPLATES: Dict[str, str] = {
+# One keep-alive connection pool shared by every OpenAI client so repeat
+# calls reuse the TCP+TLS session instead of re-handshaking.
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client():
+    global _http_client
+    if httpx is None:
+        return None
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                try:
+                    # HTTP/2 multiplexes concurrent calls over one socket;
+                    # needs the h2 extra, so fall back to HTTP/1.1 keep-alive
+                    _http_client = httpx.Client(http2=True, timeout=120)
+                except Exception:
+                    try:
+                        _http_client = httpx.Client(timeout=120)
+                    except Exception:
+                        return None
+    return _http_client
+
+# Static instructions live in the system message so the request prefix is
+# byte-identical across calls (provider-side prompt caching keys on the
+# prefix); everything request-specific goes in the user message below.
+SYSTEM_PROMPTS: Dict[str, str] = {
     "summary": (
         "You are an expert academic summarizer. Write a concise, faithful, and well-structured **summary** "
-        "of the provided sources in {language}, with a target length of ~{words} words (±10%). "
+        "of the provided sources, in the requested language and at the requested length. "
         "Preserve key terms, avoid hallucinations, and do not include content not supported by the sources.\n\n"
-        "{notes_block}\n"
-        "== SOURCES ==\n{sources}\n\n"
         "== OUTPUT RULES ==\n"
         "- Use clear headings.\n"
         "- Bullet points where useful.\n"
         "- No page markers. No citations unless explicitly present in the text.\n"
     ),
     "detailed": (
-        "You are an expert technical writer. Produce a **detailed, structured report** in {language} "
-        "based strictly on the provided sources, ~{words} words (±10%). "
+        "You are an expert technical writer. Produce a **detailed, structured report** "
+        "based strictly on the provided sources, in the requested language and at the requested length. "
         "Explain important concepts with brief, precise definitions and include a short executive summary at the top.\n\n"
-        "{notes_block}\n"
-        "== SOURCES ==\n{sources}\n\n"
         "== OUTPUT RULES ==\n"
         "- Use H2/H3 headings.\n"
         "- Include short executive summary, key insights, and practical recommendations.\n"
         "- Avoid fabrications. No page markers.\n"
     ),
     "study note": (
-        "Create **exam-ready study notes** in {language}, ~{words} words (±10%), strictly from the sources.\n\n"
-        "{notes_block}\n"
-        "== SOURCES ==\n{sources}\n\n"
+        "Create **exam-ready study notes** strictly from the provided sources, "
+        "in the requested language and at the requested length.\n\n"
         "== OUTPUT RULES ==\n"
         "- Use concise bullet points.\n"
         "- Include formulas or definitions when present.\n"
@@ -72,9 +131,8 @@ PROMPT_TEMPLATES: Dict[str, str] = {
         "- No page markers.\n"
     ),
     "presentation": (
-        "Create a **presentation-style outline** in {language}, ~{words} words (±10%), based strictly on the sources.\n\n"
-        "{notes_block}\n"
-        "== SOURCES ==\n{sources}\n\n"
+        "Create a **presentation-style outline** based strictly on the provided sources, "
+        "in the requested language and at the requested length.\n\n"
         "== OUTPUT RULES ==\n"
         "- Structure as slides with titles and 3–6 bullets each.\n"
         "- Start with Agenda. End with Key Takeaways.\n"
@@ -82,6 +140,101 @@ PROMPT_TEMPLATES: Dict[str, str] = {
     ),
 }
 
+# Dynamic tail: identical across tasks, so one template is enough
+USER_PROMPT_TEMPLATE = (
+    "Language: {language}. Target length: ~{words} words (±10%).\n\n"
+    "{notes_block}\n"
+    "== SOURCES ==\n{sources}\n"
+)
+
+# Split once at import so format() only ever touches the short preamble;
+# the (potentially 120k-char) corpus is joined in, never scanned by format
+_USER_PROMPT_PRE, _USER_PROMPT_POST = USER_PROMPT_TEMPLATE.split("{sources}")
+
+# Single-pass scrubbers: one walk over the string and one result
+# allocation instead of a full pass (and intermediate copy) per pattern.
+_CLEAN_RE = re.compile(r"[ \t\x00]+|\n{3,}")
+_PAGE_SCRUB_RE = re.compile(
+    r"-{2,}\s*Page\s+\d+\s*-{2,}|\s*\[?Page\s+\d+\]?\s*|\n{3,}", re.I
+)
+
+
+def _clean_repl(m: "re.Match[str]") -> str:
+    # Runs of spaces/tabs/NULs collapse to one space; 3+ newlines to two
+    return " " if m.group()[0] != "\n" else "\n\n"
+
+
+def _page_scrub_repl(m: "re.Match[str]") -> str:
+    # Page markers vanish; bare newline runs collapse to a blank line
+    return " " if "page" in m.group().lower() else "\n\n"
+
+
+# Stream scrubbing holds back this many chars so a page marker arriving
+# split across pieces can't straddle a flush boundary
+_STREAM_HOLDBACK = 64
+
+# Mock scaffolds as single pre-joined strings: only the header line is
+# dynamic, so the per-call list build + join was pure overhead
+_MOCK_HEADERS: Dict[str, str] = {
+    "summary": "Executive Summary",
+    "detailed": "Detailed Report",
+    "study note": "Study Notes",
+    "presentation": "Presentation Outline",
+}
+
+_MOCK_TEMPLATES: Dict[str, str] = {
+    "summary": (
+        "# {header}\n\n"
+        "## Overview\n\n"
+        "- Main idea and scope.\n\n"
+        "## Key Insights\n\n"
+        "- Insight 1\n- Insight 2\n- Insight 3\n\n"
+        "## Conclusion\n\n"
+        "- Short wrap-up."
+    ),
+    "detailed": (
+        "# {header}\n\n"
+        "## Executive Summary\n\n"
+        "- High-level overview with main findings.\n\n"
+        "## Background\n\n"
+        "- Context and definitions.\n\n"
+        "## Analysis\n\n"
+        "- Evidence-backed points derived from sources.\n\n"
+        "## Recommendations\n\n"
+        "- Actionable, prioritized steps.\n\n"
+        "## Conclusion\n\n"
+        "- Final synthesis."
+    ),
+    "study note": (
+        "# {header}\n\n"
+        "## Core Concepts\n\n"
+        "- Term 1: short definition\n- Term 2: short definition\n- Term 3: short definition\n\n"
+        "## Key Points\n\n"
+        "- Point A\n- Point B\n- Point C\n\n"
+        "## Examples\n\n"
+        "- Example 1\n- Example 2\n\n"
+        "## Quick Self-Check (5)\n\n"
+        "1) Question 1?\n2) Question 2?\n3) Question 3?\n4) Question 4?\n5) Question 5?"
+    ),
+    "presentation": (
+        "# {header}\n\n"
+        "## Agenda\n\n"
+        "- Problem Overview\n- Key Insights\n- Method/Approach\n- Results\n- Limitations\n- Key Takeaways\n\n"
+        "## Slide 1 — Problem Overview\n\n"
+        "- Brief context\n- Why it matters\n- Scope and objectives\n\n"
+        "## Slide 2 — Key Insights\n\n"
+        "- Insight 1\n- Insight 2\n- Insight 3\n\n"
+        "## Slide 3 — Method/Approach\n\n"
+        "- Data used\n- Steps\n- Constraints\n\n"
+        "## Slide 4 — Results\n\n"
+        "- Result A\n- Result B\n- Result C\n\n"
+        "## Slide 5 — Limitations\n\n"
+        "- Data quality\n- Assumptions\n- External factors\n\n"
+        "## Key Takeaways\n\n"
+        "- Takeaway 1\n- Takeaway 2\n- Takeaway 3"
+    ),
+}
+
 TASK_ALIASES = {
     "summary": "summary",
     "summarize": "summary",
@@ -107,6 +260,13 @@ class GenerateOptions:
     notes: str = ""
     output: str = "txt"  # 'txt' | 'docx' | 'pdf'
 
+    def __post_init__(self) -> None:
+        # Cap the free-text fields so a hostile form post can't make every
+        # prompt build (and mock retry) materialize multi-MB strings
+        self.task = (self.task or "summary")[:32]
+        self.language = (self.language or "English")[:64]
+        self.notes = (self.notes or "")[:4096]
+
     def normalized_task(self) -> str:
         t = self.task.strip().lower()
         return TASK_ALIASES.get(t, "summary")
@@ -135,7 +295,110 @@ class GenerateOptions:
 # File Analyzer
 # -----------------------------
 
+# Extracted-text sidecars live under UPLOAD_FOLDER/<CACHE_SUBDIR>/
+CACHE_SUBDIR = ".cache"
+
+# Lowercase, no dot — checked straight off the filename, no PurePath needed
+_ALLOWED_EXTS = ("pdf", "docx", "txt")
+
+# WordprocessingML tags for the streaming docx reader
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_T = _DOCX_NS + "t"
+_DOCX_P = _DOCX_NS + "p"
+
+
 class FileAnalyzer:
+    @staticmethod
+    def _cached_text_path(uploads_dir: str, name: str, st: Optional[os.stat_result] = None) -> str:
+        # Keyed by (mtime, size): re-uploading a file changes the key, so a
+        # stale sidecar simply stops matching — no invalidation bookkeeping.
+        if st is None:
+            st = os.stat(os.path.join(uploads_dir, name))
+        return os.path.join(
+            uploads_dir, CACHE_SUBDIR, f"{name}.{st.st_mtime_ns}-{st.st_size}.txt"
+        )
+
+    @staticmethod
+    def extract_file_text(path: str, max_chars: Optional[int] = None) -> str:
+        """Extract and clean the text of a single .pdf/.docx/.txt file."""
+        ext = os.path.splitext(path)[1].lower()
+        content = ""
+        try:
+            if ext == ".txt":
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    content = f.read(max_chars) if max_chars else f.read()
+            elif ext == ".docx":
+                fast = FileAnalyzer._extract_docx_fast(path, max_chars=max_chars)
+                if fast is not None:
+                    content = fast
+                elif docx is not None:
+                    doc = docx.Document(path)
+                    if max_chars is None:
+                        content = "\n".join(p.text for p in doc.paragraphs)
+                    else:
+                        # Stop walking paragraphs once the budget is spent
+                        parts: List[str] = []
+                        total = 0
+                        for p in doc.paragraphs:
+                            t = p.text
+                            parts.append(t)
+                            total += len(t) + 1
+                            if total >= max_chars:
+                                break
+                        content = "\n".join(parts)
+            elif ext == ".pdf":
+                content = FileAnalyzer._extract_pdf(path, max_chars=max_chars)
+        except Exception:
+            content = ""
+        return FileAnalyzer._clean_text(content)
+
+    @staticmethod
+    def cache_extracted_text(uploads_dir: str, name: str, max_chars: int = 200_000) -> None:
+        """
+        Extract once (typically right after upload) and persist the cleaned
+        text as a sidecar, so /generate reads bytes instead of re-parsing.
+        """
+        path = os.path.join(uploads_dir, name)
+        text = FileAnalyzer.extract_file_text(path, max_chars=max_chars)
+        cache_dir = os.path.join(uploads_dir, CACHE_SUBDIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        # A re-upload gets a new key, so clear any sidecars left from the
+        # previous version of this name before writing the fresh one.
+        FileAnalyzer.drop_cached_text(uploads_dir, name)
+        try:
+            sidecar = FileAnalyzer._cached_text_path(uploads_dir, name)
+        except OSError:
+            return
+        # Write-then-rename: the warm-up runs on a background thread, so a
+        # concurrent /generate must never see a half-written sidecar. The
+        # keyed path only ever appears complete via the atomic replace.
+        tmp = sidecar + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, sidecar)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    @staticmethod
+    def drop_cached_text(uploads_dir: str, name: str) -> None:
+        # The source file may already be gone, so match sidecars by name
+        # prefix rather than recomputing the (mtime, size) key.
+        prefix = name + "."
+        try:
+            with os.scandir(os.path.join(uploads_dir, CACHE_SUBDIR)) as it:
+                for entry in it:
+                    if entry.name.startswith(prefix):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+
     @staticmethod
     def extract_corpus(app, max_chars: int = 120_000) -> Tuple[str, Dict[str, Any]]:
         """
@@ -144,7 +407,6 @@ class FileAnalyzer:
         Returns (corpus, metas)
         """
         uploads_dir = app.config.get("UPLOAD_FOLDER", "uploads")
-        allowed_exts = {".pdf", ".docx", ".txt"}
 
         texts: List[str] = []
         metas: Dict[str, Any] = {"files": [], "total_chars": 0}
@@ -152,64 +414,151 @@ class FileAnalyzer:
         if not os.path.isdir(uploads_dir):
             return "", metas
 
-        for name in sorted(os.listdir(uploads_dir)):
-            path = os.path.join(uploads_dir, name)
-            if not os.path.isfile(path):
-                continue
-            ext = os.path.splitext(name)[1].lower()
-            if ext not in allowed_exts:
-                continue
+        # scandir hands back DirEntry objects whose is_file() answers from
+        # the directory read itself — no per-name stat round-trip
+        candidates: List[Tuple[str, str]] = []
+        with os.scandir(uploads_dir) as it:
+            for entry in it:
+                name = entry.name
+                # Cheap extension filter first so rejected names skip is_file
+                dot = name.rfind(".")
+                ext = name[dot + 1:].lower() if dot >= 0 else ""
+                if ext not in _ALLOWED_EXTS:
+                    continue
+                if not entry.is_file():
+                    continue
+                candidates.append((name, entry.path))
+        candidates.sort(key=lambda t: t[0])
+
+        if not candidates:
+            return "", metas
 
-            content = ""
+        # Extraction is independent per file and the parsers release the
+        # GIL in native code, so fan out. Each file gets a generous slice
+        # of the budget; the real clamp happens sequentially below.
+        n = len(candidates)
+        per_file = max_chars if n == 1 else min(max_chars, (max_chars // n) * 2)
+
+        def _read_one(item: Tuple[str, str]) -> Tuple[str, str]:
+            name, path = item
+            # Prefer the sidecar written at upload time (already cleaned);
+            # its key embeds (mtime, size), so a changed source misses and
+            # falls back to a fresh, budget-capped extraction.
             try:
-                if ext == ".txt":
-                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                elif ext == ".docx" and docx is not None:
-                    doc = docx.Document(path)
-                    content = "\n".join(p.text for p in doc.paragraphs)
-                elif ext == ".pdf" and PdfReader is not None:
-                    reader = PdfReader(path)
-                    pages_text = []
-                    for page in reader.pages:
-                        try:
-                            pages_text.append(page.extract_text() or "")
-                        except Exception:
-                            pages_text.append("")
-                    content = "\n".join(pages_text)
-            except Exception:
-                content = ""
-
-            content = FileAnalyzer._clean_text(content)
+                with open(FileAnalyzer._cached_text_path(uploads_dir, name), "r", encoding="utf-8") as f:
+                    return name, f.read(per_file)
+            except OSError:
+                return name, FileAnalyzer.extract_file_text(path, max_chars=per_file)
+
+        if n == 1:
+            results = [_read_one(candidates[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(8, n)) as ex:
+                results = list(ex.map(_read_one, candidates))
+
+        # Running counter instead of re-summing len(t) for every file
+        total_chars = 0
+        for name, content in results:
             if not content:
                 continue
 
-            # Add and clamp
-            remaining = max_chars - sum(len(t) for t in texts)
+            remaining = max_chars - total_chars
             if remaining <= 0:
                 break
 
             if len(content) > remaining:
                 content = content[:remaining]
 
-            texts.append(f"\n\n===== FILE: {name} =====\n{content}")
+            part = f"\n\n===== FILE: {name} =====\n{content}"
+            texts.append(part)
+            total_chars += len(part)
             metas["files"].append({"name": name, "chars": len(content)})
-            metas["total_chars"] = sum(len(t) for t in texts)
-
-            if metas["total_chars"] >= max_chars:
-                break
 
+        metas["total_chars"] = total_chars
         corpus = "\n".join(texts).strip()
         return corpus, metas
 
+    @staticmethod
+    def _extract_docx_fast(path: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Stream docx text straight from word/document.xml with iterparse
+        instead of letting python-docx build its full object model — only
+        the w:t text nodes are touched and each paragraph element is
+        cleared after use, so memory stays flat for large documents.
+        Returns None when lxml is missing or the file doesn't parse, so
+        the caller can fall back to python-docx.
+        """
+        if etree is None:
+            return None
+        try:
+            with zipfile.ZipFile(path) as zf:
+                xml = zf.read("word/document.xml")
+            parts: List[str] = []
+            total = 0
+            for _event, elem in etree.iterparse(
+                io.BytesIO(xml), events=("end",), tag=(_DOCX_T, _DOCX_P)
+            ):
+                if elem.tag == _DOCX_T:
+                    t = elem.text
+                    if t:
+                        parts.append(t)
+                        total += len(t)
+                else:
+                    # Paragraph boundary; clearing here drops its subtree
+                    parts.append("\n")
+                    total += 1
+                elem.clear()
+                if max_chars is not None and total >= max_chars:
+                    break
+            return "".join(parts)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _extract_pdf(path: str, max_chars: Optional[int] = None) -> str:
+        """
+        Extract PDF text, preferring PyMuPDF (C-backed, ~10x faster) with
+        PyPDF2 as fallback. Stops reading pages once max_chars is reached.
+        """
+        parts: List[str] = []
+        total = 0
+
+        if fitz is not None:
+            try:
+                with fitz.open(path) as doc:
+                    for page in doc:
+                        t = page.get_text("text") or ""
+                        parts.append(t)
+                        total += len(t) + 1
+                        if max_chars is not None and total >= max_chars:
+                            break
+                return "\n".join(parts)
+            except Exception:
+                parts = []
+                total = 0
+
+        if PdfReader is None:
+            return ""
+        try:
+            reader = PdfReader(path)
+            for page in reader.pages:
+                try:
+                    t = page.extract_text() or ""
+                except Exception:
+                    t = ""
+                parts.append(t)
+                total += len(t) + 1
+                if max_chars is not None and total >= max_chars:
+                    break
+        except Exception:
+            return ""
+        return "\n".join(parts)
+
     @staticmethod
     def _clean_text(s: str) -> str:
         if not s:
             return ""
-        s = s.replace("\x00", " ")
-        s = re.sub(r"[ \t]+", " ", s)
-        s = re.sub(r"\n{3,}", "\n\n", s)
-        return s.strip()
+        return _CLEAN_RE.sub(_clean_repl, s).strip()
 
 
 # -----------------------------
@@ -223,13 +572,21 @@ class SummarizerService:
         self._client = None
         if self.api_key and OpenAI is not None:
             try:
-                self._client = OpenAI(api_key=self.api_key)
+                http_client = _shared_http_client()
+                if http_client is not None:
+                    self._client = OpenAI(api_key=self.api_key, http_client=http_client)
+                else:
+                    self._client = OpenAI(api_key=self.api_key)
             except Exception:
                 self._client = None
 
     @staticmethod
-    def build_user_prompt(corpus: str, options: GenerateOptions) -> str:
+    def build_system_prompt(options: GenerateOptions) -> str:
         task = options.normalized_task()
+        return SYSTEM_PROMPTS.get(task, SYSTEM_PROMPTS["summary"]).strip()
+
+    @staticmethod
+    def build_user_prompt(corpus: str, options: GenerateOptions) -> str:
         language = options.normalized_language()
         words = options.clamped_words()
 
@@ -238,9 +595,8 @@ class SummarizerService:
             notes_block = f"== USER NOTES ==\n{options.notes.strip()}\n"
 
         sources = corpus if corpus.strip() else "(No sources uploaded. If no sources, say so and provide only general structure.)"
-        template = PROMPT_TEMPLATES.get(task, PROMPT_TEMPLATES["summary"])
-        prompt = template.format(language=language, words=words, notes_block=notes_block, sources=sources)
-        return prompt.strip()
+        pre = _USER_PROMPT_PRE.format(language=language, words=words, notes_block=notes_block)
+        return "".join((pre, sources, _USER_PROMPT_POST)).strip()
 
     def generate(self, corpus: str, options: GenerateOptions) -> str:
         prompt = self.build_user_prompt(corpus, options)
@@ -249,31 +605,171 @@ class SummarizerService:
         if (not self._client) or (not self.api_key):
             return self.mock_generate_from_inputs(prompt, options)
 
+        # Identical regenerate clicks are common; serve them from the
+        # exact-match cache instead of paying for another API call.
+        cache_key = None
+        if llm_cache is not None:
+            cache_key = llm_cache.make_key(
+                self.model,
+                options.normalized_task(),
+                options.clamped_words(),
+                options.normalized_language(),
+                options.notes,
+                corpus,
+            )
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        system_prompt = self.build_system_prompt(options)
+
+        # Optional near-duplicate lookup (SEMANTIC_CACHE=1); no-op when the
+        # embedding dependencies are missing. The embedded text includes the
+        # model and system prompt: the user prompt alone is identical across
+        # tasks, which would make a summary "match" a presentation request.
+        semantic_key = f"{self.model}\n{system_prompt}\n{prompt}"
+        if semantic_cache is not None:
+            near = semantic_cache.get(semantic_key)
+            if near is not None:
+                return near
+
         try:
             # OpenAI Responses API (v1)
-            resp = self._client.chat.completions.create(
+            def _call():
+                return self._client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.2,
+                )
+
+            # Concurrent requests go out as one wave through the batcher
+            resp = llm_batcher.submit(_call) if llm_batcher is not None else _call()
+            text = self._post_process((resp.choices[0].message.content or "").strip())
+            if cache_key is not None and text:
+                llm_cache.put(cache_key, text)
+            if semantic_cache is not None and text:
+                semantic_cache.put(semantic_key, text)
+            return text
+        except Exception:
+            return self.mock_generate_from_inputs(prompt, options)
+
+    def generate_stream(self, corpus: str, options: GenerateOptions):
+        """Yield response text pieces as the model produces them.
+
+        Same inputs and same output text as generate(): pieces are scrubbed
+        through the page-marker post-processing as they stream (a short tail
+        is held back so a marker can't straddle a flush), and both caches
+        are consulted and populated, a hit arriving as one piece. Falls back
+        to yielding the mock output whole when no client is configured or
+        the call fails before anything was sent.
+        """
+        prompt = self.build_user_prompt(corpus, options)
+
+        if (not self._client) or (not self.api_key):
+            yield self.mock_generate_from_inputs(prompt, options)
+            return
+
+        cache_key = None
+        if llm_cache is not None:
+            cache_key = llm_cache.make_key(
+                self.model,
+                options.normalized_task(),
+                options.clamped_words(),
+                options.normalized_language(),
+                options.notes,
+                corpus,
+            )
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        system_prompt = self.build_system_prompt(options)
+        semantic_key = f"{self.model}\n{system_prompt}\n{prompt}"
+        if semantic_cache is not None:
+            near = semantic_cache.get(semantic_key)
+            if near is not None:
+                yield near
+                return
+
+        try:
+            stream = self._client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "You are a careful assistant that strictly uses the provided sources."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.2,
+                stream=True,
             )
-            text = (resp.choices[0].message.content or "").strip()
-            return self._post_process(text)
         except Exception:
-            return self.mock_generate_from_inputs(prompt, options)
+            yield self.mock_generate_from_inputs(prompt, options)
+            return
+
+        emitted: List[str] = []
+        pending = ""
+        try:
+            for chunk in stream:
+                try:
+                    piece = chunk.choices[0].delta.content
+                except (AttributeError, IndexError):
+                    piece = None
+                if not piece:
+                    continue
+                pending += piece
+                out, pending = self._flush_scrubbed(pending, first=not emitted)
+                if out:
+                    yield out
+                    emitted.append(out)
+            tail = _PAGE_SCRUB_RE.sub(_page_scrub_repl, pending)
+            tail = tail.rstrip() if emitted else tail.strip()
+            if tail:
+                yield tail
+                emitted.append(tail)
+        except Exception:
+            # Mid-stream failure: earlier pieces are already sent, so only
+            # fall back to the mock when nothing went out at all.
+            if not emitted:
+                yield self.mock_generate_from_inputs(prompt, options)
+            return
+
+        text = "".join(emitted)
+        if text:
+            if cache_key is not None:
+                llm_cache.put(cache_key, text)
+            if semantic_cache is not None:
+                semantic_cache.put(semantic_key, text)
+
+    @staticmethod
+    def _flush_scrubbed(pending: str, first: bool) -> Tuple[str, str]:
+        """Scrub and release the stable front of the stream buffer.
+
+        Holds back the last _STREAM_HOLDBACK characters and never cuts
+        inside a whitespace run, so a page marker or newline run arriving
+        across piece boundaries is always scrubbed as one match.
+        """
+        if len(pending) < _STREAM_HOLDBACK * 2:
+            return "", pending
+        cut = len(pending) - _STREAM_HOLDBACK
+        while cut > 0 and pending[cut - 1].isspace():
+            cut -= 1
+        if cut <= 0:
+            return "", pending
+        out = _PAGE_SCRUB_RE.sub(_page_scrub_repl, pending[:cut])
+        if first:
+            out = out.lstrip()
+        return out, pending[cut:]
 
     @staticmethod
     def _post_process(text: str) -> str:
         if not text:
             return ""
-        # Remove page markers if any pattern like [Page X], (Page X), --- Page X ---
-        text = re.sub(r"\s*\[?Page\s+\d+\]?\s*", " ", text, flags=re.I)
-        text = re.sub(r"-{2,}\s*Page\s+\d+\s*-{2,}", " ", text, flags=re.I)
-        # Normalize newlines
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        return text.strip()
+        # Remove page markers ([Page X], --- Page X ---) and normalize
+        # newlines in a single compiled pass
+        return _PAGE_SCRUB_RE.sub(_page_scrub_repl, text).strip()
 
     @staticmethod
     def mock_generate_from_inputs(prompt: str, options: GenerateOptions) -> str:
@@ -281,72 +777,11 @@ class SummarizerService:
         language = options.normalized_language()
         words = options.clamped_words()
 
-        header_map = {
-            "summary": "Executive Summary",
-            "detailed": "Detailed Report",
-            "study note": "Study Notes",
-            "presentation": "Presentation Outline",
-        }
-        h = header_map.get(task, "Summary")
-
         # Lightweight deterministic mock respecting language & words intent
         # (We won't actually hit the exact word count; just provide a solid scaffold.)
-        blocks = [
-            f"# {h} ({language}, ~{words} words)",
-        ]
-
-        if task == "presentation":
-            blocks += [
-                "## Agenda",
-                "- Problem Overview\n- Key Insights\n- Method/Approach\n- Results\n- Limitations\n- Key Takeaways",
-                "## Slide 1 — Problem Overview",
-                "- Brief context\n- Why it matters\n- Scope and objectives",
-                "## Slide 2 — Key Insights",
-                "- Insight 1\n- Insight 2\n- Insight 3",
-                "## Slide 3 — Method/Approach",
-                "- Data used\n- Steps\n- Constraints",
-                "## Slide 4 — Results",
-                "- Result A\n- Result B\n- Result C",
-                "## Slide 5 — Limitations",
-                "- Data quality\n- Assumptions\n- External factors",
-                "## Key Takeaways",
-                "- Takeaway 1\n- Takeaway 2\n- Takeaway 3",
-            ]
-        elif task == "study note":
-            blocks += [
-                "## Core Concepts",
-                "- Term 1: short definition\n- Term 2: short definition\n- Term 3: short definition",
-                "## Key Points",
-                "- Point A\n- Point B\n- Point C",
-                "## Examples",
-                "- Example 1\n- Example 2",
-                "## Quick Self-Check (5)",
-                "1) Question 1?\n2) Question 2?\n3) Question 3?\n4) Question 4?\n5) Question 5?",
-            ]
-        elif task == "detailed":
-            blocks += [
-                "## Executive Summary",
-                "- High-level overview with main findings.",
-                "## Background",
-                "- Context and definitions.",
-                "## Analysis",
-                "- Evidence-backed points derived from sources.",
-                "## Recommendations",
-                "- Actionable, prioritized steps.",
-                "## Conclusion",
-                "- Final synthesis.",
-            ]
-        else:  # summary
-            blocks += [
-                "## Overview",
-                "- Main idea and scope.",
-                "## Key Insights",
-                "- Insight 1\n- Insight 2\n- Insight 3",
-                "## Conclusion",
-                "- Short wrap-up.",
-            ]
-
-        text = "\n\n".join(blocks)
+        h = _MOCK_HEADERS.get(task, "Summary")
+        template = _MOCK_TEMPLATES.get(task, _MOCK_TEMPLATES["summary"])
+        text = template.format(header=f"{h} ({language}, ~{words} words)")
         return SummarizerService._post_process(text)
 
 
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Exact-match cache for LLM responses. Identical inputs (same model, task,
+# words, language, notes, and corpus) return the stored response without a
+# network round-trip; entries expire after a TTL.
+
+DEFAULT_TTL_S = int(os.getenv("LLM_CACHE_TTL_S", str(24 * 3600)))
+_DB_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.getcwd(), ".cache", "llm_cache.db"))
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(_DB_PATH, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def make_key(model: str, task: str, words: int, language: str, notes: str, corpus: str) -> str:
+    # Length-prefix every field so boundaries are unambiguous — joining
+    # user-controlled strings with a separator would let notes="a|b"
+    # collide with notes="a", corpus="b|...".
+    h = hashlib.sha256()
+    for field in (model, task, str(words), language, notes, corpus):
+        data = field.encode("utf-8")
+        h.update(f"{len(data)}:".encode("ascii"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def get(key: str, ttl_s: int = DEFAULT_TTL_S) -> Optional[str]:
+    try:
+        with _lock:
+            row = _get_conn().execute(
+                "SELECT response, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    response, created = row
+    if time.time() - created > ttl_s:
+        return None
+    return response
+
+
+def put(key: str, response: str) -> None:
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created) VALUES (?, ?, ?)",
+                (key, response, time.time()),
+            )
+            conn.commit()
+    except sqlite3.Error:
+        pass
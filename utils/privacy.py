@@ -3,5 +3,9 @@ import hashlib
 def hash_ip(ip: str, salt: str) -> str:
     if not ip:
         return ""
-    payload = (salt + ip).encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+    # Keyed BLAKE2b: the salt goes through the key slot instead of string
+    # concatenation (no salt+ip ambiguity, no intermediate string) and is
+    # faster per call than sha256; digest_size=32 keeps a 64-char hex
+    # digest that fits the ip_hash column.
+    key = salt.encode("utf-8")[:64]
+    return hashlib.blake2b(ip.encode("utf-8"), key=key, digest_size=32).hexdigest()